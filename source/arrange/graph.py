@@ -29,11 +29,9 @@ class GType(Enum):
 
 @dataclass(slots=True)
 class CrossingReduction:
-    socket_ranks: dict[Socket, float] = field(default_factory=dict)
     barycenter: float | None = None
 
     def reset(self) -> None:
-        self.socket_ranks.clear()
         self.barycenter = None
 
 
@@ -58,6 +56,7 @@ class GNode:
     lowest_po_num: int
 
     col: list[GNode]
+    idx_in_col: int
     cr: CrossingReduction
 
     x: float
@@ -102,6 +101,7 @@ class GNode:
         self.lowest_po_num = None  # type: ignore
 
         self.col = None  # type: ignore
+        self.idx_in_col = None  # type: ignore
         self.cr = CrossingReduction()
 
         self.x = None  # type: ignore
@@ -9,13 +9,13 @@
 from __future__ import annotations
 
 import random
-from collections import defaultdict
-from collections.abc import Callable, Collection, Iterator, Sequence
+from collections import defaultdict, deque
+from collections.abc import Callable, Collection, Iterable, Iterator, Sequence
 from dataclasses import dataclass, field, replace
 from functools import cache
 from itertools import chain, pairwise
 from math import inf
-from typing import TypeAlias, cast
+from typing import Any, TypeAlias, cast
 
 import networkx as nx
 
@@ -30,19 +30,30 @@ def get_col_nesting_trees(
   columns: Sequence[Collection[GNode]],
   T: _MixedGraph,
 ) -> list[_MixedGraph]:
+    anc = get_ancestor_map(T)
     trees = []
     for col in columns:
         LT = nx.DiGraph()
-        nodes = set(chain(col, *[nx.ancestors(T, v) for v in col]))
-        LT.add_edges_from([(u, v) for u in nodes for v in T[u] if v in nodes])
+        nodes = set(col).union(*[anc[v] for v in col])
+        LT.add_edges_from([(u, v) for u, v in T.edges(nodes) if v in nodes])
         trees.append(LT)
 
     return trees
 
 
 @cache
-def reflexive_transitive_closure(LT: _MixedGraph) -> _MixedGraph:
-    return cast(_MixedGraph, nx.transitive_closure(LT, reflexive=True))
+def get_descendant_map(LT: _MixedGraph) -> dict[GNode | Cluster, set[GNode | Cluster]]:
+
+    # Reflexive descendant sets in one reverse-topological pass. This answers everything the
+    # reflexive transitive closure was used for, without materializing its O(V^2) edge set.
+
+    desc: dict[GNode | Cluster, set[GNode | Cluster]] = {}
+    for u in reversed(list(nx.topological_sort(LT))):
+        desc[u] = {u}
+        for v in LT[u]:
+            desc[u] |= desc[v]
+
+    return desc
 
 
 @cache
@@ -50,9 +61,28 @@ def topologically_sorted_clusters(LT: _MixedGraph) -> list[Cluster]:
     return [h for h in nx.topological_sort(LT) if h.type == GType.CLUSTER]
 
 
+@cache
+def get_ancestor_map(T: _MixedGraph) -> dict[GNode | Cluster, set[Cluster]]:
+
+    # All ancestor sets in one topological pass, instead of a DFS per `nx.ancestors` call.
+
+    anc: dict[GNode | Cluster, set[Cluster]] = {}
+    for v in nx.topological_sort(T):
+        anc[v] = set()
+        for u in T.pred[v]:
+            anc[v] |= anc[u]
+            anc[v].add(cast(Cluster, u))
+
+    return anc
+
+
+_AdjDict: TypeAlias = 'dict[GNode | Cluster, dict[GNode | Cluster, list[dict[str, Any]]]]'
+_EdgeTable: TypeAlias = 'dict[GNode, list[tuple[GNode, GNode, int, dict[str, Any]]]]'
+
+
 @dataclass(slots=True)
 class _ClusterCrossingsData:
-    graph: nx.MultiDiGraph[GNode | Cluster]
+    degrees: dict[GNode | Cluster, int]
     reduced_free_col: list[GNode | Cluster]
 
     fixed_sockets: dict[GNode, list[Socket]] = field(default_factory=dict)
@@ -67,32 +97,53 @@ class _ClusterCrossingsData:
 def get_crossing_reduction_graph(
   h: Cluster,
   LT: _MixedGraph,
-  G: nx.MultiDiGraph[GNode],
-) -> nx.MultiDiGraph[GNode | Cluster]:
-    G_h = nx.MultiDiGraph()
-    G_h.add_nodes_from(LT[h])
-    TC = reflexive_transitive_closure(LT)
-    for s, t, k, d in G.in_edges(TC[h], data=True, keys=True):  # type: ignore
-        c = next(c for c in TC.pred[t] if c in LT[h])
-
-        input_k = 'to_socket'
-        output_k = 'from_socket'
-        if d[output_k].owner != s:
-            input_k, output_k = output_k, input_k
-
-        if (s, c, k) in G_h.edges and G_h.edges[s, c, k][output_k] == d[output_k]:
-            G_h.edges[s, c, k]['weight'] += 1
+  in_edges: _EdgeTable,
+) -> tuple[_AdjDict, _AdjDict]:
+
+    # The reduced graph is only ever queried for adjacency and degrees, so plain dict-of-dicts
+    # (forward and transposed) beat an `nx.MultiDiGraph` with its per-operation overhead.
+
+    desc = get_descendant_map(LT)
+
+    # Children's descendant sets are disjoint, so each descendant of `h` has a unique ancestor
+    # among `LT[h]`. Mapping them upfront avoids an ancestor walk for every edge.
+    owner_in_h = {t: c for c in LT[h] for t in desc[c]}
+
+    edge_lists: defaultdict[tuple[GNode, GNode | Cluster], list[dict[str, Any]]] = defaultdict(list)
+    for t in desc[h]:
+        edges_t = in_edges.get(t)  # type: ignore[arg-type]
+
+        if not edges_t:
             continue
 
-        to_socket = d[input_k] if c.type != GType.CLUSTER else replace(d[input_k], owner=c, idx=0)
-        G_h.add_edge(s, c, weight=1, from_socket=d[output_k], to_socket=to_socket)
+        c = owner_in_h[t]
+        for s, _, k, d in edges_t:
+            input_k = 'to_socket'
+            output_k = 'from_socket'
+            if d[output_k].owner != s:
+                input_k, output_k = output_k, input_k
+
+            edges = edge_lists[s, c]
+            if k < len(edges) and edges[k][output_k] == d[output_k]:
+                edges[k]['weight'] += 1
+                continue
+
+            to_socket = d[input_k] if c.type != GType.CLUSTER else replace(
+              d[input_k], owner=c, idx=0)
+            edges.append({'weight': 1, 'from_socket': d[output_k], 'to_socket': to_socket})
 
-    return G_h
+    out_adj: _AdjDict = {}
+    in_adj: _AdjDict = {v: {} for v in LT[h]}
+    for (s, c), ds in edge_lists.items():
+        out_adj.setdefault(s, {})[c] = ds
+        in_adj[c][s] = ds
 
+    return out_adj, in_adj
 
-def add_bipartite_edges(H: _ClusterCrossingsData) -> None:
+
+def add_bipartite_edges(H: _ClusterCrossingsData, edge_data: Iterable[dict[str, Any]]) -> None:
     B = nx.DiGraph()
-    edges = [(d['from_socket'], d['to_socket'], d) for *_, d in H.graph.edges.data()]
+    edges = [(d['from_socket'], d['to_socket'], d) for d in edge_data]
     B.add_edges_from(edges)
 
     if B.edges:
@@ -109,6 +160,7 @@ def add_bipartite_edges(H: _ClusterCrossingsData) -> None:
 
 def crossing_reduction_data(
   G: nx.MultiDiGraph[GNode],
+  in_edges: _EdgeTable,
   trees: Sequence[_MixedGraph],
   backwards: bool = False,
 ) -> Iterator[list[_ClusterCrossingsData]]:
@@ -116,19 +168,24 @@ def crossing_reduction_data(
         prev_clusters = cast(set[Cluster], set(trees[i - 1]) - G.nodes)
         data = []
         for h in topologically_sorted_clusters(LT):
-            G_h = get_crossing_reduction_graph(h, LT, G)
-            H = _ClusterCrossingsData(G_h, list(LT[h]))
+            out_adj, in_adj = get_crossing_reduction_graph(h, LT, in_edges)
+
+            degrees = {
+              v: sum(map(len, out_adj.get(v, {}).values())) + sum(map(len, in_adj[v].values()))
+              for v in LT[h]}
+            H = _ClusterCrossingsData(degrees, list(LT[h]))
 
             u: GNode
-            for u in chain(*[G_h.pred[v] for v in LT[h]]):  # pyright: ignore[reportAssignmentType]
-                sockets = {e[2] for e in G_h.out_edges(u, data='from_socket')}
+            for u in chain(*[in_adj[v] for v in LT[h]]):  # pyright: ignore[reportAssignmentType]
+                sockets = {d['from_socket'] for ds in out_adj[u].values() for d in ds}
                 H.fixed_sockets[u] = sorted(sockets, key=lambda d: d.idx, reverse=not backwards)
 
             for v in LT[h]:
-                H.free_sockets[v] = [e[2] for e in G_h.in_edges(v, data='from_socket')]
+                H.free_sockets[v] = [d['from_socket'] for ds in in_adj[v].values() for d in ds]
 
             H.constrained_clusters.extend([v for v in H.reduced_free_col if v in prev_clusters])
-            add_bipartite_edges(H)
+            edge_data = [d for targets in out_adj.values() for ds in targets.values() for d in ds]
+            add_bipartite_edges(H, edge_data)
 
             data.append(H)
 
@@ -141,26 +198,38 @@ _FreeColumns = list[tuple[list[GNode], _MixedGraph, list[_ClusterCrossingsData]]
 _RANDOM_AMOUNT = 0.07
 
 
-def calc_socket_ranks(H: _ClusterCrossingsData, is_forwards: bool) -> None:
+def _reindex(col: Sequence[GNode]) -> None:
+    for i, v in enumerate(col):
+        v.idx_in_col = i
+
+
+def calc_socket_ranks(H: _ClusterCrossingsData, is_forwards: bool) -> dict[Socket, float]:
+
+    # One flat rank table per cluster: the free sockets' owners are exactly the fixed nodes of
+    # the same cluster, so the barycenter loop can look ranks up without chasing attributes.
+
+    socket_ranks = {}
     for v, sockets in H.fixed_sockets.items():
         incr = 1 / (len(sockets) + 1)
-        rank = v.col.index(v) + 1
+        rank = v.idx_in_col + 1
         if is_forwards:
             incr = -incr
 
         for socket in sockets:
             rank += incr
-            v.cr.socket_ranks[socket] = rank
+            socket_ranks[socket] = rank
 
+    return socket_ranks
 
-def calc_barycenters(H: _ClusterCrossingsData) -> None:
+
+def calc_barycenters(H: _ClusterCrossingsData, socket_ranks: dict[Socket, float]) -> None:
     for w in H.reduced_free_col:
         sockets = H.free_sockets[w]
 
         if not sockets:
             continue
 
-        weight = sum([s.owner.cr.socket_ranks[s] for s in sockets])
+        weight = sum([socket_ranks[s] for s in sockets])
         weight += random.uniform(0, 1) * _RANDOM_AMOUNT - _RANDOM_AMOUNT / 2
         w.cr.barycenter = weight / len(sockets)
 
@@ -188,35 +257,42 @@ def fill_in_unknown_barycenters(col: list[GNode | Cluster], is_first_iter: bool)
         v.cr.barycenter = (prev_b + next_b) / 2
 
 
-def find_violated_constraint(GC: _MixedGraph) -> tuple[GNode | Cluster, GNode | Cluster] | None:
-    active = [v for v in GC if GC[v] and not GC.pred[v]]
-    incoming_constraints = defaultdict(list)
-    while active:
-        v = active.pop(0)
+def handle_constraints(H: _ClusterCrossingsData) -> None:
 
-        for c in incoming_constraints[v]:
-            if c[0].cr.barycenter >= v.cr.barycenter:
-                return c
+    # The constraint graph is kept as plain adjacency dicts, patched in place when nodes are
+    # merged, instead of rebuilding an `nx.DiGraph` per iteration.
+    succ: dict[GNode | Cluster, list[GNode | Cluster]] = {}
+    pred: dict[GNode | Cluster, list[GNode | Cluster]] = {}
+    if len(H.constrained_clusters) > 1:
+        for v in H.constrained_clusters:
+            succ[v] = []
+            pred[v] = []
 
-        for t in GC[v]:
-            incoming_constraints[t].insert(0, (v, t))
-            if len(incoming_constraints[t]) == GC.in_degree[t]:
-                active.append(t)
+        for u, v in pairwise(H.constrained_clusters):
+            succ[u].append(v)
+            pred[v].append(u)
 
-    return None
+    def find_violated_constraint() -> tuple[GNode | Cluster, GNode | Cluster] | None:
+        remaining = {v: len(pred[v]) for v in pred}
+        active = deque(v for v in succ if succ[v] and not pred[v])
+        while active:
+            v = active.popleft()
 
+            for t in succ[v]:
+                if v.cr.barycenter >= t.cr.barycenter:
+                    return (v, t)
 
-def handle_constraints(H: _ClusterCrossingsData) -> None:
+                remaining[t] -= 1
+                if remaining[t] == 0:
+                    active.append(t)
 
-    # Optimization: don't pass constraints to `nx.DiGraph` constructor
-    GC = nx.DiGraph()
-    GC.add_edges_from(pairwise(H.constrained_clusters))
+        return None
 
-    unconstrained = set(H.reduced_free_col) - GC.nodes
+    unconstrained = set(H.reduced_free_col) - succ.keys()
     L = {v: [v] for v in H.reduced_free_col}
 
-    deg = {v: H.graph.degree[v] for v in GC}
-    while c := find_violated_constraint(GC):
+    deg = {v: H.degrees[v] for v in succ}
+    while c := find_violated_constraint():
         v_c = GNode(type=GType.DUMMY)
         s, t = c
 
@@ -229,18 +305,55 @@ def handle_constraints(H: _ClusterCrossingsData) -> None:
 
         L[v_c] = L[s] + L[t]
 
-        nx.relabel_nodes(GC, {s: v_c, t: v_c}, copy=False)
-        if (v_c, v_c) in GC.edges:
-            GC.remove_edge(v_c, v_c)
-
-        if v_c not in GC:
-            unconstrained.add(v_c)
+        merged = {s, t}
+        succ[v_c] = [w for w in (*succ.pop(s), *succ.pop(t)) if w not in merged]
+        pred[v_c] = [u for u in (*pred.pop(s), *pred.pop(t)) if u not in merged]
+        for u in pred[v_c]:
+            succ[u] = [v_c if w in merged else w for w in succ[u]]
+        for w in succ[v_c]:
+            pred[w] = [v_c if u in merged else u for u in pred[w]]
 
-    groups = sorted(unconstrained | GC.nodes, key=get_barycenter)
+    groups = sorted(unconstrained | succ.keys(), key=get_barycenter)
     for i, v in enumerate(chain(*[L[v] for v in groups])):
         v.cr.barycenter = i
 
 
+_TREE_BUF: list[int] = []
+
+
+def _count_crossings(indices: Sequence[int], weights: Sequence[int], first_idx: int) -> int:
+
+    # Accumulator-tree pass, extracted so the inner loop works on plain ints with no dict or
+    # attribute lookups. The tree buffer is reused across calls, zeroing only the prefix in
+    # use, since this runs for every cluster of every column on every iteration.
+
+    n = 2 * first_idx - 1
+    tree = _TREE_BUF
+    if len(tree) < n:
+        tree.extend([0] * (n - len(tree)))
+
+    for i in range(n):
+        tree[i] = 0
+
+    first_idx -= 1
+
+    cross_weight = 0
+    for idx, weight in zip(indices, weights):
+        idx += first_idx
+        tree[idx] += weight
+        weight_sum = 0
+        while idx > 0:
+            if idx % 2 == 1:
+                weight_sum += tree[idx + 1]
+
+            idx = (idx - 1) // 2
+            tree[idx] += weight
+
+        cross_weight += weight * weight_sum
+
+    return cross_weight
+
+
 def get_cross_count(H: _ClusterCrossingsData) -> int:
     edges = H.bipartite_edges
 
@@ -251,7 +364,7 @@ def get_cross_count(H: _ClusterCrossingsData) -> int:
 
     def pos(w: Socket) -> float:
         v = w.owner
-        return v.cr.barycenter if v in reduced_free_col else v.col.index(v)  # type: ignore
+        return v.cr.barycenter if v in reduced_free_col else v.idx_in_col  # type: ignore
 
     H.N.sort(key=pos)
     H.S.sort(key=pos)
@@ -259,31 +372,17 @@ def get_cross_count(H: _ClusterCrossingsData) -> int:
     south_indicies = {k: i for i, k in enumerate(H.S)}
     north_indicies = {k: i for i, k in enumerate(H.N)}
 
-    edges.sort(key=lambda e: south_indicies[e[1]])
-    edges.sort(key=lambda e: north_indicies[e[0]])
+    # Lexicographic (north, south) order in a single pass, with both indices packed into one int.
+    shift = len(H.S).bit_length()
+    edges.sort(key=lambda e: (north_indicies[e[0]] << shift) | south_indicies[e[1]])
 
     first_idx = 1
     while first_idx < len(H.S):
         first_idx *= 2
 
-    tree = [0] * (2 * first_idx - 1)
-    first_idx -= 1
-
-    cross_weight = 0
-    for _, v, weight in edges:
-        idx = south_indicies[v] + first_idx
-        tree[idx] += weight
-        weight_sum = 0
-        while idx > 0:
-            if idx % 2 == 1:
-                weight_sum += tree[idx + 1]
-
-            idx = (idx - 1) // 2
-            tree[idx] += weight
-
-        cross_weight += weight * weight_sum
-
-    return cross_weight
+    indices = [south_indicies[v] for _, v, _ in edges]
+    weights = [w for *_, w in edges]
+    return _count_crossings(indices, weights, first_idx)
 
 
 def get_new_col_order(v: GNode | Cluster, LT: _MixedGraph) -> Iterator[GNode]:
@@ -296,18 +395,20 @@ def get_new_col_order(v: GNode | Cluster, LT: _MixedGraph) -> Iterator[GNode]:
 
 def sort_internal_columns(items: _FreeColumns) -> None:
     for free_col, LT, data in items:
+        base_index = {w: i for i, w in enumerate(free_col)}
 
-        def key(v: GNode | Cluster) -> int:
+        # A cluster sorts by its first descendant in `free_col`. The cached descendant map
+        # already holds every descendant set, so the sort keys reduce to one dict per column.
+        desc = get_descendant_map(LT)
+        indices = {}
+        for v in LT:
             if v.type == GType.CLUSTER:
-                descendants = nx.descendants(LT, v)
-                w = next(w for w in free_col if w in descendants)
-            else:
-                w = v
-
-            return free_col.index(w)
+                indices[v] = min(i for w in desc[v] if (i := base_index.get(w)) is not None)
+            elif v in base_index:
+                indices[v] = base_index[v]
 
         for H in data:
-            H.reduced_free_col.sort(key=key)
+            H.reduced_free_col.sort(key=indices.__getitem__)
 
 
 # -------------------------------------------------------------------
@@ -337,22 +438,24 @@ def minimized_cross_count(
         for i, (free_col, LT, data) in enumerate(items):
             if i == 0:
                 fixed_col = columns[0] if is_forwards else columns[-1]
-                clusters = {c: j for j, v in enumerate(fixed_col) for c in nx.ancestors(T, v)}
+                anc = get_ancestor_map(T)
+                clusters = {c: j for j, v in enumerate(fixed_col) for c in anc[v]}
                 key = cast(Callable[[Cluster], int], clusters.get)
             else:
                 key = get_barycenter
 
             for H in data:
                 H.constrained_clusters.sort(key=key)
-                calc_socket_ranks(H, is_forwards)
-                calc_barycenters(H)
+                socket_ranks = calc_socket_ranks(H, is_forwards)
+                calc_barycenters(H, socket_ranks)
                 fill_in_unknown_barycenters(H.reduced_free_col, is_first_sweep)
                 handle_constraints(H)
                 cross_count += get_cross_count(H)
 
             root = topologically_sorted_clusters(LT)[0]
-            new_order = tuple(get_new_col_order(root, LT))
-            free_col.sort(key=new_order.index)
+            order_idx = {v: i for i, v in enumerate(get_new_col_order(root, LT))}
+            free_col.sort(key=order_idx.__getitem__)
+            _reindex(free_col)
 
         if old_cross_count > cross_count:
             sort_internal_columns(forward_items + backward_items)
@@ -360,7 +463,9 @@ def minimized_cross_count(
             is_first_sweep = False
         else:
             for first_col, best_col in zip(columns, best_columns):
-                first_col.sort(key=best_col.index)
+                pos = {v: i for i, v in enumerate(best_col)}
+                first_col.sort(key=pos.__getitem__)
+                _reindex(first_col)
             break
 
     return old_cross_count
@@ -371,13 +476,24 @@ _ITERATIONS = 15
 
 def minimize_crossings(G: nx.MultiDiGraph[GNode], T: _MixedGraph) -> None:
     columns = G.graph['columns']
+    for col in columns:
+        _reindex(col)
+
     trees = get_col_nesting_trees(columns, T)
 
-    forward_data = crossing_reduction_data(G, trees)
+    # One flat edge table per direction, shared by both construction passes; the backward pass
+    # stores edges pre-swapped, replacing `nx.reverse_view` and its per-call edge views.
+    in_edges: _EdgeTable = {}
+    rev_in_edges: _EdgeTable = {}
+    for u, v, k, d in G.edges(keys=True, data=True):
+        in_edges.setdefault(v, []).append((u, v, k, d))
+        rev_in_edges.setdefault(u, []).append((v, u, k, d))
+
+    forward_data = crossing_reduction_data(G, in_edges, trees)
     forward_items = list(zip(columns[1:], trees[1:], forward_data))
 
     trees.reverse()
-    backward_data = crossing_reduction_data(nx.reverse_view(G), trees, True)  # type: ignore
+    backward_data = crossing_reduction_data(G, rev_in_edges, trees, True)
     backward_items = list(zip(columns[-2::-1], trees[1:], backward_data))
 
     # -------------------------------------------------------------------
@@ -394,5 +510,7 @@ def minimize_crossings(G: nx.MultiDiGraph[GNode], T: _MixedGraph) -> None:
                 break
         else:
             for col, best_col in zip(columns, best_columns):
-                col.sort(key=best_col.index)
+                pos = {v: i for i, v in enumerate(best_col)}
+                col.sort(key=pos.__getitem__)
+                _reindex(col)
             sort_internal_columns(forward_items + backward_items)
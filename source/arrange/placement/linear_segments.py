@@ -37,19 +37,27 @@ class Segment:
 
     def split(self, v: GNode) -> Segment:
         nodes = self.nodes
-        new_segment = Segment(nodes[nodes.index(v):])
+        i = nodes.index(v)
+        new_segment = Segment(nodes[i:])
+        del nodes[i:]
         for w in new_segment:
             w.segment = new_segment
-            nodes.remove(w)
 
         return new_segment
 
     def region(self) -> Segment:
+        root = self
+        while s := root.ref_segment:
+            root = s
+
+        # Path compression: point every segment on the walked chain directly at the root, so
+        # repeated lookups stay near O(1) even on long merge chains.
         segment = self
-        while s := segment.ref_segment:
+        while (s := segment.ref_segment) is not None:
+            segment.ref_segment = root
             segment = s
 
-        return segment
+        return root
 
 
 class _Mode(Enum):
@@ -127,14 +135,22 @@ def get_linear_segments(CG: ClusterGraph) -> list[Segment]:
 
 def prevent_cycles(linear_segments: list[Segment], columns: Sequence[Sequence[GNode]]) -> None:
     for col1, col2 in pairwise(reversed(columns)):
-        for i, v in enumerate(col1):
-            segments2 = [w.segment for w in col2]
 
-            if v.segment not in segments2:
+        # Splitting only reassigns nodes from `v` rightwards, so `col2`'s segments are stable
+        # and their positions can be computed once per column pair.
+        segments2 = [w.segment for w in col2]
+        seg2_pos = {s: i for i, s in enumerate(segments2)}
+
+        # A segment has at most one node per column, so `col1`'s segments are unique and can be
+        # maintained in place as splits reassign them, instead of rebuilding the list per node.
+        segments1 = [w.segment for w in col1]
+        seg1_pos = {s: j for j, s in enumerate(segments1)}
+
+        for i, v in enumerate(col1):
+            if (pos2 := seg2_pos.get(v.segment)) is None:
                 continue
 
-            segments1 = [w.segment for w in col1]
-            below = set(segments2[segments2.index(v.segment) + 1:])
+            below = set(segments2[pos2 + 1:])
             cycle_segments = [s for s in segments1[:i] if s in below]
 
             if not cycle_segments:
@@ -142,9 +158,16 @@ def prevent_cycles(linear_segments: list[Segment], columns: Sequence[Sequence[GN
 
             if v.type == GType.VERTICAL_BORDER:
                 for s in cycle_segments:
-                    linear_segments.append(s.split(col1[segments1.index(s)]))
+                    j = seg1_pos[s]
+                    new_segment = s.split(col1[j])
+                    linear_segments.append(new_segment)
+                    segments1[j] = new_segment
+                    seg1_pos[new_segment] = j
             else:
-                linear_segments.append(v.segment.split(v))
+                new_segment = v.segment.split(v)
+                linear_segments.append(new_segment)
+                segments1[i] = new_segment
+                seg1_pos[new_segment] = i
 
 
 def sort_linear_segments(
@@ -168,11 +191,20 @@ def sort_linear_segments(
 
 def create_unbalanced_placement(linear_segments: Sequence[Segment]) -> None:
     heights = {s: max([v.height for v in s]) for s in linear_segments}
+
+    # Segments are placed in sorted order and each node's y is set exactly once, so the minimum
+    # of `w.y - heights[w.segment]` per column can be maintained incrementally instead of
+    # rescanning every column of every segment.
+    col_min: dict[int, float] = {}
     for segment in linear_segments:
-        values = [w.y - heights[w.segment] for v in segment for w in v.col if w.y is not None]
+        values = [m for v in segment if (m := col_min.get(id(v.col))) is not None]
         lowest_y = min(values, default=0) - config.MARGIN.y
+        placed = lowest_y - heights[segment]
         for v in segment:
             v.y = lowest_y
+            key = id(v.col)
+            if (m := col_min.get(key)) is None or placed < m:
+                col_min[key] = placed
 
 
 _DEFLECTION_DAMPENING = 0.1
@@ -182,38 +214,62 @@ _FINAL_ITERS = 3
 _THRESH_FAC = 20
 
 
-@cache
-def get_out_edges(G: nx.DiGraph[GNode], v: GNode) -> list[tuple[Socket, Socket]]:
-    return [#
-      (d['from_socket'], d['to_socket'])
-      for _, w, d in G.out_edges.data(nbunch=v)
-      if w.segment != v.segment]
+_EdgeTerms = list[tuple[GNode, 'list[tuple[GNode, float]]', 'list[tuple[GNode, float]]']]
 
 
-@cache
-def get_in_edges(G: nx.DiGraph[GNode], v: GNode) -> list[tuple[Socket, Socket]]:
-    return [#
-      (d['from_socket'], d['to_socket'])
-      for u, _, d in G.in_edges.data(nbunch=v)
-      if u.segment != v.segment]
+def get_deflection_terms(
+  G: nx.DiGraph[GNode],
+  linear_segments: Sequence[Segment],
+) -> dict[Segment, _EdgeTerms]:
+
+    # Each inter-segment edge contributes `2 * (other.y - v.y) + offset` to a node's deflection,
+    # with the socket offsets constant for the whole balance pass. Reducing edges to
+    # `(other, offset)` pairs upfront keeps the deflection loop free of `Socket` property calls.
 
+    # Segments are final once `sort_linear_segments` has run, so the inter-segment edges can be
+    # gathered in a single pass instead of per-node `@cache`d EdgeView traversals.
+    out_edges: dict[GNode, list[tuple[Socket, Socket]]] = {v: [] for v in G}
+    in_edges: dict[GNode, list[tuple[Socket, Socket]]] = {v: [] for v in G}
+    for u, w, d in G.edges.data():
+        if u.segment != w.segment:
+            sockets = (d['from_socket'], d['to_socket'])
+            out_edges[u].append(sockets)
+            in_edges[w].append(sockets)
 
-def calc_deflection(G: nx.DiGraph[GNode], segment: Segment, mode: _Mode) -> None:
+    terms = {}
+    for segment in linear_segments:
+        seg_terms = []
+        for v in segment:
+            out_terms = [
+              (t.owner, (t.y - t.owner.y) - (f.y - v.y)) for f, t in out_edges[v]]
+            in_terms = [
+              (f.owner, (f.y - f.owner.y) - (t.y - v.y)) for f, t in in_edges[v]]
+            seg_terms.append((v, out_terms, in_terms))
+
+        terms[segment] = seg_terms
+
+    return terms
+
+
+def calc_deflection(segment: Segment, seg_terms: _EdgeTerms, mode: _Mode) -> None:
     segment_deflection = 0
     node_weight_sum = 0
-    for v in segment:
-        node_deflection = 0
+    for v, out_terms, in_terms in seg_terms:
+        node_deflection = 0.0
         edge_weight_sum = 0
+        y = v.y
 
         if mode != _Mode.FORW_PENDULUM:
-            for from_socket, to_socket in get_out_edges(G, v):
-                node_deflection += to_socket.owner.y + to_socket.y - (v.y + from_socket.y)
-                edge_weight_sum += 1
+            for w, offset in out_terms:
+                node_deflection += 2 * (w.y - y) + offset
+
+            edge_weight_sum += len(out_terms)
 
         if mode != _Mode.BACKW_PENDULUM:
-            for from_socket, to_socket in get_in_edges(G, v):
-                node_deflection += from_socket.owner.y + from_socket.y - (v.y + to_socket.y)
-                edge_weight_sum += 1
+            for w, offset in in_terms:
+                node_deflection += 2 * (w.y - y) + offset
+
+            edge_weight_sum += len(in_terms)
 
         if edge_weight_sum > 0:
             segment_deflection += node_deflection / edge_weight_sum
@@ -261,6 +317,8 @@ def balance_placement(G: nx.DiGraph[GNode], linear_segments: Sequence[Segment])
     pendulum_iters = _PENDULUM_ITERS
     final_iters = _FINAL_ITERS
 
+    terms = get_deflection_terms(G, linear_segments)
+
     ready = False
     mode = _Mode.FORW_PENDULUM
     prev_total_deflection = inf
@@ -268,7 +326,7 @@ def balance_placement(G: nx.DiGraph[GNode], linear_segments: Sequence[Segment])
         total_deflection = 0
         for segment in linear_segments:
             segment.ref_segment = None
-            calc_deflection(G, segment, mode)
+            calc_deflection(segment, terms[segment], mode)
             total_deflection += abs(segment.deflection)
 
         merge_regions(G.graph['columns'])
@@ -3,13 +3,13 @@
 from __future__ import annotations
 
 from collections import defaultdict
-from collections.abc import Callable, Collection, Iterable, Iterator, Sequence
+from collections.abc import Callable, Collection, Iterable, Sequence
 from itertools import chain, pairwise, product
-from statistics import fmean
 from typing import Any, cast
 
 import networkx as nx
-from bpy.types import Node, NodeFrame, NodeTree
+import numpy as np
+from bpy.types import Node, NodeFrame, NodeLinks, NodeSocket, NodeTree
 from mathutils import Vector
 from mathutils.geometry import intersect_line_line_2d
 
@@ -28,8 +28,17 @@ def precompute_links(ntree: NodeTree) -> None:
 
     # Precompute links to ignore invalid/hidden links, and avoid `O(len(ntree.links))` time
 
-    for link in ntree.links:
-        if not link.is_hidden and link.is_valid:
+    links = ntree.links
+
+    # The filter flags come over in two bulk C calls, rather than two RNA attribute reads per
+    # link; only the surviving links pay for their socket lookups.
+    is_hidden = [False] * len(links)
+    is_valid = [False] * len(links)
+    links.foreach_get('is_hidden', is_hidden)
+    links.foreach_get('is_valid', is_valid)
+
+    for link, hidden, valid in zip(links, is_hidden, is_valid):
+        if not hidden and valid:
             config.linked_sockets[link.to_socket].add(link.from_socket)
             config.linked_sockets[link.from_socket].add(link.to_socket)
 
@@ -43,23 +52,46 @@ def get_multidigraph() -> nx.MultiDiGraph[GNode]:
     G = nx.MultiDiGraph()
     G.add_nodes_from([
       GNode(n, parents[n.parent]) for n in config.selected if n.bl_idname != 'NodeFrame'])
+
+    # Resolve link targets through dicts built once per node, instead of scanning `G` and the
+    # target's RNA input list for every link.
+    gnode_of = {v.node: v for v in G}
+    input_indices: dict[Node, dict[NodeSocket, int]] = {}
     for u in G:
         for i, from_output in enumerate(u.node.outputs):
             for to_input in config.linked_sockets[from_output]:
-                if not to_input.node.select:
+                if (v := gnode_of.get(to_input.node)) is None:
                     continue
 
-                v = next(v for v in G if v.node == to_input.node)
-                j = to_input.node.inputs[:].index(to_input)
+                if (indices := input_indices.get(to_input.node)) is None:
+                    indices = {s: j for j, s in enumerate(to_input.node.inputs)}
+                    input_indices[to_input.node] = indices
+
+                j = indices[to_input]
                 G.add_edge(u, v, from_socket=Socket(u, i, True), to_socket=Socket(v, j, False))
 
     return G
 
 
-def get_nesting_relations(v: GNode | Cluster) -> Iterator[tuple[Cluster, GNode | Cluster]]:
-    if c := v.cluster:
-        yield (c, v)
-        yield from get_nesting_relations(c)
+def get_nesting_relations(nodes: Iterable[GNode]) -> list[tuple[Cluster, GNode | Cluster]]:
+
+    # Nodes sharing a frame also share every ancestor above it, so each cluster's chain only
+    # needs walking the first time it's reached.
+
+    relations: list[tuple[Cluster, GNode | Cluster]] = []
+    seen = set()
+    for v in nodes:
+        cur: GNode | Cluster = v
+        while c := cur.cluster:
+            relations.append((c, cur))
+
+            if c in seen:
+                break
+
+            seen.add(c)
+            cur = c
+
+    return relations
 
 
 def save_multi_input_orders(G: nx.MultiDiGraph[GNode]) -> None:
@@ -92,6 +124,7 @@ def add_dummy_nodes_to_edge(
   G: nx.MultiDiGraph[GNode],
   edge: tuple[GNode, GNode, int],
   dummy_nodes: Sequence[GNode],
+  links: NodeLinks,
 ) -> None:
     if not dummy_nodes:
         return
@@ -114,7 +147,6 @@ def add_dummy_nodes_to_edge(
     if not is_real(u) or not is_real(v):
         return
 
-    links = get_ntree().links
     if d['to_socket'].bpy.is_multi_input:
         target_link = (d['from_socket'].bpy, d['to_socket'].bpy)
         links.remove(next(l for l in links if (l.from_socket, l.to_socket) == target_link))
@@ -126,31 +158,127 @@ _FRAME_PADDING = 29.8
 
 
 def lowest_common_cluster(
-  T: nx.DiGraph[GNode | Cluster],
+  CG: ClusterGraph,
   edges: Iterable[tuple[GNode, GNode, Any]],
 ) -> dict[tuple[GNode, GNode], Cluster]:
     pairs = {(u, v) for u, v, _ in edges if u.cluster != v.cluster}
-    return dict(nx.tree_all_pairs_lowest_common_ancestor(T, pairs=pairs))
+    return {(u, v): cast(Cluster, CG.lca(u, v)) for u, v in pairs}
 
 
 def label_height(c: Cluster) -> float:
     return -(_FRAME_PADDING / 2 - c.node.label_size * 1.25) if c.node and c.node.label else 0
 
 
+def get_cluster_descendants(T: nx.DiGraph[GNode | Cluster]) -> dict[Cluster, set[GNode]]:
+
+    # Every cluster's non-cluster descendants in one reverse-topological pass, instead of a BFS
+    # per `nx.descendants` call that re-visits nested clusters once per ancestor.
+
+    desc: dict[Cluster, set[GNode]] = {}
+    for c in reversed(list(nx.topological_sort(T))):
+        if c.type != GType.CLUSTER:
+            continue
+
+        nodes = set()
+        for w in T[c]:
+            if w.type == GType.CLUSTER:
+                nodes |= desc[w]
+            else:
+                nodes.add(w)
+
+        desc[cast(Cluster, c)] = nodes
+
+    return desc
+
+
+def add_to_descendants(desc: dict[Cluster, set[GNode]], v: GNode) -> None:
+    c = v.cluster
+    while c is not None:
+        desc[c].add(v)
+        c = c.cluster
+
+
 # https://api.semanticscholar.org/CorpusID:14932050
 class ClusterGraph:
     G: nx.MultiDiGraph[GNode]
     T: nx.DiGraph[GNode | Cluster]
     S: set[Cluster]
+    ntree: NodeTree
+    _lca_table: tuple[
+      dict[GNode | Cluster, int], list[dict[GNode | Cluster, GNode | Cluster]]] | None
     __slots__ = tuple(__annotations__)
 
     def __init__(self, G: nx.MultiDiGraph[GNode]) -> None:
         self.G = G
-        self.T = nx.DiGraph(chain(*map(get_nesting_relations, G)))
+        self.T = nx.DiGraph(get_nesting_relations(G))
         self.S = {v for v in self.T if v.type == GType.CLUSTER}
 
+        # Fetched once: every `bpy.context.space_data.edit_tree` access goes through the RNA
+        # layer, which is too slow for the hot loops below.
+        self.ntree = get_ntree()
+
+        self._lca_table = None
+
+    # https://doi.org/10.1007/10719839_9
+    def _build_lca_table(self) -> None:
+        T = self.T
+        root = next(v for v in T if not T.pred[v])
+
+        depth: dict[GNode | Cluster, int] = {root: 0}
+        parent: dict[GNode | Cluster, GNode | Cluster] = {}
+        stack: list[GNode | Cluster] = [root]
+        while stack:
+            u = stack.pop()
+            for w in T[u]:
+                parent[w] = u
+                depth[w] = depth[u] + 1
+                stack.append(w)
+
+        # `up[k][v]` is the 2^k-th ancestor of `v`; entries past the root are simply absent.
+        up = [parent]
+        for _ in range(1, max(depth.values(), default=0).bit_length()):
+            prev = up[-1]
+            up.append({v: prev[p] for v, p in prev.items() if p in prev})
+
+        self._lca_table = (depth, up)
+
+    def lca(self, u: GNode | Cluster, v: GNode | Cluster) -> GNode | Cluster:
+
+        # Without frames the nesting tree is a star, so no table is needed.
+        if len(self.S) == 1:
+            return next(iter(self.S))
+
+        if self._lca_table is None:
+            self._build_lca_table()
+
+        assert self._lca_table
+        depth, up = self._lca_table
+
+        if depth[u] < depth[v]:
+            u, v = v, u
+
+        diff = depth[u] - depth[v]
+        k = 0
+        while diff:
+            if diff & 1:
+                u = up[k][u]
+
+            diff >>= 1
+            k += 1
+
+        if u == v:
+            return u
+
+        for table in reversed(up):
+            if table.get(u) != table.get(v):
+                u = table[u]
+                v = table[v]
+
+        return up[0][u]
+
     def remove_nodes_from(self, nodes: Iterable[GNode]) -> None:
-        ntree = get_ntree()
+        self._lca_table = None
+        ntree = self.ntree
         for v in nodes:
             self.G.remove_node(v)
             self.T.remove_node(v)
@@ -160,13 +288,12 @@ class ClusterGraph:
             if not is_real(v):
                 continue
 
-            sockets = {*v.node.inputs, *v.node.outputs}
-
-            for socket in sockets:
-                config.linked_sockets.pop(socket, None)
-
-            for val in config.linked_sockets.values():
-                val -= sockets
+            # `linked_sockets` is symmetric, so only the peers of the removed sockets need
+            # updating, not every set in the mapping.
+            for socket in chain(v.node.inputs, v.node.outputs):
+                for peer in config.linked_sockets.pop(socket, ()):
+                    if (val := config.linked_sockets.get(peer)) is not None:
+                        val.discard(socket)
 
             config.selected.remove(v.node)
             ntree.nodes.remove(v.node)
@@ -174,6 +301,7 @@ class ClusterGraph:
     def merge_edges(self) -> None:
         G = self.G
         T = self.T
+        links = self.ntree.links
         groups = group_by(G.edges(keys=True), key=lambda e: G.edges[e]['from_socket'])
         edges: tuple[tuple[GNode, GNode, int], ...]
         for edges, from_socket in groups.items():
@@ -183,7 +311,7 @@ class ClusterGraph:
                 continue
 
             long_edges.sort(key=lambda e: e[1].rank)
-            lca = lowest_common_cluster(T, long_edges)
+            lca = lowest_common_cluster(self, long_edges)
             dummy_nodes = []
             for u, v, k in long_edges:
                 if dummy_nodes and dummy_nodes[-1].rank == v.rank - 1:
@@ -195,7 +323,7 @@ class ClusterGraph:
                     T.add_edge(c, w)
                     dummy_nodes.append(w)
 
-                add_dummy_nodes_to_edge(G, (u, v, k), [w])
+                add_dummy_nodes_to_edge(G, (u, v, k), [w], links)
                 G.remove_edge(u, w)
 
             for pair in pairwise(dummy_nodes):
@@ -204,6 +332,8 @@ class ClusterGraph:
             w = dummy_nodes[0]
             G.add_edge(u, dummy_nodes[0], from_socket=from_socket, to_socket=Socket(w, 0, False))
 
+        self._lca_table = None
+
     def insert_dummy_nodes(self) -> None:
         G = self.G
         T = self.T
@@ -211,25 +341,29 @@ class ClusterGraph:
         # -------------------------------------------------------------------
 
         long_edges = [(u, v, k) for u, v, k in G.edges(keys=True) if v.rank - u.rank > 1]
-        lca = lowest_common_cluster(T, long_edges)
+        lca = lowest_common_cluster(self, long_edges)
+
+        # Allocating every chain upfront lets a single `add_edges_from` register the nesting
+        # edges, instead of paying networkx's per-call bookkeeping for each dummy node.
+        dummy_chains = []
         for u, v, k in long_edges:
             assert u.cluster
             c = lca.get((u, v), u.cluster)
-            dummy_nodes = []
-            for i in range(u.rank + 1, v.rank):
-                w = GNode(None, c, GType.DUMMY, i)
-                T.add_edge(c, w)
-                dummy_nodes.append(w)
+            dummy_chains.append([GNode(None, c, GType.DUMMY, i) for i in range(u.rank + 1, v.rank)])
 
-            add_dummy_nodes_to_edge(G, (u, v, k), dummy_nodes)
+        T.add_edges_from((w.cluster, w) for nodes in dummy_chains for w in nodes)
+        links = self.ntree.links
+        for e, dummy_nodes in zip(long_edges, dummy_chains):
+            add_dummy_nodes_to_edge(G, e, dummy_nodes, links)
 
         # -------------------------------------------------------------------
 
+        desc = get_cluster_descendants(T)
         for c in self.S:
             if not c.node:
                 continue
 
-            ranks = sorted({v.rank for v in nx.descendants(T, c) if v.type != GType.CLUSTER})
+            ranks = sorted({v.rank for v in desc[c]})
             for i, j in pairwise(ranks):
                 if j - i == 1:
                     continue
@@ -238,6 +372,7 @@ class ClusterGraph:
                 for k in range(i + 1, j):
                     v = GNode(None, c, GType.VERTICAL_BORDER, k)
                     T.add_edge(c, v)
+                    add_to_descendants(desc, v)
 
                     if u:
                         add_dummy_edge(G, u, v)
@@ -246,38 +381,67 @@ class ClusterGraph:
 
                     u = v
 
+        self._lca_table = None
+
     def add_vertical_border_nodes(self) -> None:
         T = self.T
         G = self.G
         columns = G.graph['columns']
+        col_idx = {id(col): i for i, col in enumerate(columns)}
+        desc = get_cluster_descendants(T)
         for c in self.S:
             if not c.node:
                 continue
 
-            nodes = [v for v in nx.descendants(T, c) if v.type != GType.CLUSTER]
+            nodes = desc[c]
             lower_border_nodes = []
             upper_border_nodes = []
-            for subcol in group_by(nodes, key=lambda v: columns.index(v.col), sort=True):
+
+            # Insertions are deferred so every touched column is rebuilt in a single pass (which
+            # also refreshes `idx_in_col`), instead of paying an O(n) `list.insert` per border
+            # node.
+            inserts_before: dict[GNode, GNode] = {}
+            inserts_after: dict[GNode, GNode] = {}
+            cols = []
+            for subcol in group_by(nodes, key=lambda v: col_idx[id(v.col)], sort=True):
                 col = subcol[0].col
-                indices = [col.index(v) for v in subcol]
+                cols.append(col)
 
                 lower_v = GNode(None, c, GType.VERTICAL_BORDER)
-                col.insert(max(indices) + 1, lower_v)
                 lower_v.col = col
                 T.add_edge(c, lower_v)
+                add_to_descendants(desc, lower_v)
                 lower_border_nodes.append(lower_v)
+                inserts_after[max(subcol, key=lambda v: v.idx_in_col)] = lower_v
 
                 upper_v = GNode(None, c, GType.VERTICAL_BORDER)
                 upper_v.height += label_height(c)
-                col.insert(min(indices), upper_v)
                 upper_v.col = col
                 T.add_edge(c, upper_v)
+                add_to_descendants(desc, upper_v)
                 upper_border_nodes.append(upper_v)
+                inserts_before[min(subcol, key=lambda v: v.idx_in_col)] = upper_v
+
+            for col in cols:
+                rebuilt = []
+                for v in col:
+                    if (w := inserts_before.get(v)) is not None:
+                        rebuilt.append(w)
+
+                    rebuilt.append(v)
+                    if (w := inserts_after.get(v)) is not None:
+                        rebuilt.append(w)
+
+                col[:] = rebuilt
+                for i, v in enumerate(col):
+                    v.idx_in_col = i
 
             G.add_nodes_from(lower_border_nodes + upper_border_nodes)
             for p in *pairwise(lower_border_nodes), *pairwise(upper_border_nodes):
                 add_dummy_edge(G, *p)
 
+        self._lca_table = None
+
 
 # -------------------------------------------------------------------
 
@@ -289,13 +453,15 @@ def get_reroute_paths(G: nx.DiGraph[GNode], function: Callable | None = None) ->
         if G.out_degree[v] > 1:
             SG.remove_edges_from(tuple(SG.out_edges(v)))
 
-    indicies = {v: i for i, v in enumerate(nx.topological_sort(G)) if v in reroutes}
+    # Only the relative order of reroutes matters, so sorting the (much smaller) induced
+    # subgraph avoids a full-graph traversal.
+    indicies = {v: i for i, v in enumerate(nx.topological_sort(SG))}
     paths = [sorted(c, key=lambda v: indicies[v]) for c in nx.weakly_connected_components(SG)]
     paths.sort(key=lambda p: indicies[p[0]])
     return paths
 
 
-def is_safe_to_remove(v: GNode) -> bool:
+def is_safe_to_remove(v: GNode, selected: set[Node]) -> bool:
     if not is_real(v):
         return True
 
@@ -305,15 +471,18 @@ def is_safe_to_remove(v: GNode) -> bool:
     if v in {w.owner for w in chain(*config.multi_input_sort_ids.values())}:
         return False
 
+    # Testing against the cached selection replaces a `.select` RNA read per linked socket.
+    # (`bpy_struct` hashes by RNA pointer, so fresh wrappers still match the snapshot.)
     return all(
-      s.node.select for s in chain(
+      s.node in selected for s in chain(
       config.linked_sockets[v.node.inputs[0]],
       config.linked_sockets[v.node.outputs[0]],
       ))
 
 
 def get_reroute_segments(CG: ClusterGraph) -> list[list[GNode]]:
-    reroute_paths = get_reroute_paths(CG.G, is_safe_to_remove)
+    selected = set(config.selected)
+    reroute_paths = get_reroute_paths(CG.G, lambda v: is_safe_to_remove(v, selected))
     order = tuple(chain(*reroute_paths))
 
     reroute_clusters = {#
@@ -337,7 +506,7 @@ def get_reroute_segments(CG: ClusterGraph) -> list[list[GNode]]:
     return sorted(map(list, reroute_segments), key=lambda s: order.index(s[0]))
 
 
-def dissolve_reroute_edges(G: nx.DiGraph[GNode], path: list[GNode]) -> None:
+def dissolve_reroute_edges(G: nx.DiGraph[GNode], path: list[GNode], links: NodeLinks) -> None:
     if not G[path[-1]]:
         return
 
@@ -355,7 +524,6 @@ def dissolve_reroute_edges(G: nx.DiGraph[GNode], path: list[GNode]) -> None:
             path.clear()
             return
 
-    links = get_ntree().links
     for i in succ_inputs:
         G.add_edge(u, i.owner, from_socket=o, to_socket=i)
         links.new(o.bpy, i.bpy)
@@ -365,6 +533,7 @@ def remove_reroutes(CG: ClusterGraph) -> None:
     reroute_clusters = {#
       c for c in CG.S
       if all(v.type != GType.CLUSTER and v.is_reroute for v in CG.T[c])}
+    links = CG.ntree.links
     for path in get_reroute_segments(CG):
         if path[0].cluster in reroute_clusters:
             if len(path) > 2:
@@ -372,7 +541,7 @@ def remove_reroutes(CG: ClusterGraph) -> None:
                 add_dummy_edge(CG.G, u, v)
                 CG.remove_nodes_from(between)
         else:
-            dissolve_reroute_edges(CG.G, path)
+            dissolve_reroute_edges(CG.G, path, links)
             CG.remove_nodes_from(path)
 
 
@@ -384,24 +553,38 @@ def add_columns(G: nx.DiGraph[GNode]) -> None:
     G.graph['columns'] = columns
     for col in columns:
         col.sort(key=lambda v: abs_loc(v.node).y if is_real(v) else 0, reverse=True)
-        for v in col:
+        for i, v in enumerate(col):
             v.col = col
+            v.idx_in_col = i
 
 
 # -------------------------------------------------------------------
 
 
 def align_reroutes_with_sockets(G: nx.DiGraph[GNode]) -> None:
-    reroute_paths: dict[tuple[GNode, ...], list[Socket]] = {}
+
+    # Columns may have been reordered and shrunk since they were indexed; refresh the cached
+    # positions once so the movement loop below never has to call `list.index`.
+    for col in G.graph['columns']:
+        for i, v in enumerate(col):
+            v.idx_in_col = i
+
+    reroute_paths: dict[tuple[GNode, ...], tuple[list[Socket], list[GNode], list[GNode]]] = {}
     for path in get_reroute_paths(G):
         for subpath in group_by(path, key=lambda v: v.y):
             inputs = G.in_edges(subpath[0], data='from_socket')
             outputs = G.out_edges(subpath[-1], data='to_socket')
-            reroute_paths[subpath] = [e[2] for e in (*inputs, *outputs)]
+            foreign_sockets = [e[2] for e in (*inputs, *outputs)]
+
+            # Columns are static here, so each path's vertical neighbors can be gathered once;
+            # only their y values can change while paths move, and those are re-read below.
+            above = [v.col[v.idx_in_col - 1] for v in subpath if v.idx_in_col > 0]
+            below = [v.col[v.idx_in_col + 1] for v in subpath if v.idx_in_col < len(v.col) - 1]
+            reroute_paths[subpath] = (foreign_sockets, above, below)
 
     while True:
         changed = False
-        for path, foreign_sockets in tuple(reroute_paths.items()):
+        for path, (foreign_sockets, above, below) in tuple(reroute_paths.items()):
             y = path[0].y
             foreign_sockets.sort(key=lambda s: abs(y - s.y))
             foreign_sockets.sort(key=lambda s: y == s.owner.y, reverse=True)
@@ -413,13 +596,10 @@ def align_reroutes_with_sockets(G: nx.DiGraph[GNode]) -> None:
             movement = y - foreign_sockets[0].y
             y -= movement
             if movement < 0:
-                above_y_vals = [
-                  (w := v.col[v.col.index(v) - 1]).y - w.height for v in path if v != v.col[0]]
-                if above_y_vals and y > min(above_y_vals):
+                if above and y > min(w.y - w.height for w in above):
                     continue
             else:
-                below_y_vals = [v.col[v.col.index(v) + 1].y for v in path if v != v.col[-1]]
-                if below_y_vals and max(below_y_vals) > y - path[0].height:
+                if below and max(w.y for w in below) > y - path[0].height:
                     continue
 
             for v in path:
@@ -429,7 +609,7 @@ def align_reroutes_with_sockets(G: nx.DiGraph[GNode]) -> None:
 
         if not changed:
             if reroute_paths:
-                for path, foreign_sockets in reroute_paths.items():
+                for foreign_sockets, *_ in reroute_paths.values():
                     del foreign_sockets[0]
             else:
                 break
@@ -522,41 +702,51 @@ def add_bend_points(
   G: nx.MultiDiGraph[GNode],
   v: GNode,
   bend_points: defaultdict[tuple[GNode, GNode, int], list[GNode]],
+  dedup: dict[tuple[Socket, float, float], GNode],
+  largest: GNode,
 ) -> None:
     d: dict[str, Socket]
-    largest = max(v.col, key=lambda w: w.width)
+    right_x = largest.x + largest.width
     for u, w, k, d in *G.out_edges(v, data=True, keys=True), *G.in_edges(v, data=True, keys=True):
         socket = d['from_socket'] if v == u else d['to_socket']
-        bend_point = GNode(type=GType.DUMMY)
-        bend_point.x = largest.x + largest.width if socket.is_output else largest.x
 
-        if abs(socket.x - bend_point.x) <= _MIN_X_DIFF:
+        # Most edges get filtered out, so work with plain floats and only allocate the `GNode`
+        # once the bend point is known to be necessary.
+        x = right_x if socket.is_output else largest.x
+
+        if abs(socket.x - x) <= _MIN_X_DIFF:
             continue
 
-        bend_point.y = socket.y
-        other_socket = next(s for s in d.values() if s != socket)
+        y = socket.y
+        other_socket = d['to_socket'] if socket is d['from_socket'] else d['from_socket']
 
-        if abs(other_socket.y - bend_point.y) <= _MIN_Y_DIFF:
+        if abs(other_socket.y - y) <= _MIN_Y_DIFF:
             continue
 
         if is_unnecessary_bend_point(socket, other_socket):
             continue
 
+        # Edges leaving the same output at the same position share one bend point.
+        key = (d['from_socket'], x, y)
+        if (bend_point := dedup.get(key)) is None:
+            bend_point = GNode(type=GType.DUMMY)
+            bend_point.x = x
+            bend_point.y = y
+            dedup[key] = bend_point
+
         bend_points[u, w, k].append(bend_point)
 
 
-def route_edges(G: nx.MultiDiGraph[GNode], T: nx.DiGraph[GNode | Cluster]) -> None:
+def route_edges(CG: ClusterGraph) -> None:
+    G = CG.G
     bend_points = defaultdict(list)
-    for v in chain(*G.graph['columns']):
-        add_bend_points(G, v, bend_points)
-
-    edge_of = {v: e for e, d in bend_points.items() for v in d}
-    key = lambda v: (G.edges[edge_of[v]]['from_socket'], v.x, v.y)
-    for (target, *redundant), (from_socket, *_) in group_by(edge_of, key=key).items():
-        for v in redundant:
-            dummy_nodes = bend_points[edge_of[v]]
-            dummy_nodes[dummy_nodes.index(v)] = target
+    dedup: dict[tuple[Socket, float, float], GNode] = {}
+    for col in G.graph['columns']:
+        largest = max(col, key=lambda w: w.width)
+        for v in col:
+            add_bend_points(G, v, bend_points, dedup, largest)
 
+    for (from_socket, *_), target in dedup.items():
         u = from_socket.owner
         if not u.is_reroute or G.out_degree[u] < 2:  # type: ignore
             continue
@@ -565,10 +755,11 @@ def route_edges(G: nx.MultiDiGraph[GNode], T: nx.DiGraph[GNode | Cluster]) -> No
             if target not in bend_points[e]:
                 bend_points[e].append(target)
 
-    lca = lowest_common_cluster(T, bend_points)
+    lca = lowest_common_cluster(CG, bend_points)
+    links = CG.ntree.links
     for (u, v, k), dummy_nodes in bend_points.items():
         dummy_nodes.sort(key=lambda v: v.x)
-        add_dummy_nodes_to_edge(G, (u, v, k), dummy_nodes)
+        add_dummy_nodes_to_edge(G, (u, v, k), dummy_nodes, links)
 
         c = lca.get((u, v), u.cluster)
         for w in dummy_nodes:
@@ -600,8 +791,8 @@ def simplify_segment(CG: ClusterGraph, aligned: Sequence[GNode], path: list[GNod
             path.remove(v)
 
 
-def add_reroute(v: GNode) -> None:
-    reroute = get_ntree().nodes.new(type='NodeReroute')
+def add_reroute(v: GNode, ntree: NodeTree) -> None:
+    reroute = ntree.nodes.new(type='NodeReroute')
     assert v.cluster
     reroute.parent = v.cluster.node
     config.selected.append(reroute)
@@ -609,9 +800,8 @@ def add_reroute(v: GNode) -> None:
     v.type = GType.NODE
 
 
-def realize_edges(G: nx.DiGraph[GNode], v: GNode) -> None:
+def realize_edges(G: nx.DiGraph[GNode], v: GNode, links: NodeLinks) -> None:
     assert is_real(v)
-    links = get_ntree().links
 
     if G.pred[v]:
         pred_output = next(iter(G.in_edges(v, data='from_socket')))[2]
@@ -623,15 +813,17 @@ def realize_edges(G: nx.DiGraph[GNode], v: GNode) -> None:
 
 
 def realize_dummy_nodes(CG: ClusterGraph) -> None:
+    ntree = CG.ntree
+    links = ntree.links
     for path in get_reroute_segments(CG):
         for aligned in group_by(path, key=lambda v: v.y):
             simplify_segment(CG, aligned, path)
 
         for v in path:
             if not is_real(v):
-                add_reroute(v)
+                add_reroute(v, ntree)
 
-            realize_edges(CG.G, v)
+            realize_edges(CG.G, v, links)
 
 
 def restore_multi_input_orders(G: nx.MultiDiGraph[GNode]) -> None:
@@ -662,7 +854,7 @@ def restore_multi_input_orders(G: nx.MultiDiGraph[GNode]) -> None:
 
 
 def realize_locations(G: nx.DiGraph[GNode], old_center: Vector) -> None:
-    new_center = (fmean([v.x for v in G]), fmean([v.y for v in G]))
+    new_center = np.array([(v.x, v.y) for v in G]).mean(axis=0)
     offset_x, offset_y = -Vector(new_center) + old_center
 
     for v in G:
@@ -682,12 +874,26 @@ def realize_locations(G: nx.DiGraph[GNode], old_center: Vector) -> None:
 
 
 def sugiyama_layout(ntree: NodeTree) -> None:
-    locs = [abs_loc(n) for n in config.selected if n.bl_idname != 'NodeFrame']
+
+    # `abs_loc` would re-walk (and re-read through RNA) the same frame chain for every node in
+    # a frame; resolving each frame's offset once covers all its members.
+    offsets: dict[Node | None, Vector] = {None: Vector((0, 0))}
+
+    def frame_offset(frame: Node | None) -> Vector:
+        if (offset := offsets.get(frame)) is None:
+            offset = frame.location + frame_offset(frame.parent)
+            offsets[frame] = offset
+
+        return offset
+
+    locs = [
+      n.location + frame_offset(n.parent)
+      for n in config.selected if n.bl_idname != 'NodeFrame']
 
     if not locs:
         return
 
-    old_center = Vector(map(fmean, zip(*locs)))
+    old_center = Vector(np.asarray(locs).mean(axis=0))
 
     precompute_links(ntree)
     CG = ClusterGraph(get_multidigraph())
@@ -713,7 +919,7 @@ def sugiyama_layout(ntree: NodeTree) -> None:
 
     align_reroutes_with_sockets(G)
     assign_x_coords(G, T)
-    route_edges(G, T)
+    route_edges(CG)
 
     realize_dummy_nodes(CG)
     restore_multi_input_orders(G)